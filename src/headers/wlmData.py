@@ -25,16 +25,89 @@
 # Adopted 2021-10-28 by Reto Trappitsch for dll loading.
 
 import ctypes
+import functools
+
+# ids of DLL handles whose prototypes have already been configured
+_CONFIGURED = set()
+
+# prototypes of the functions used by `WavelengthMeter`, for the cffi backend
+_CFFI_CDEF = """
+long __stdcall GetWLMCount(long V);
+double __stdcall GetWavelengthNum(long num, double WL);
+double __stdcall GetFrequencyNum(long num, double F);
+long __stdcall GetExposureNum(long num, long arr, long E);
+long __stdcall SetExposureNum(long num, long arr, long E);
+long __stdcall GetExposureModeNum(long num, bool EM);
+long __stdcall SetExposureModeNum(long num, bool EM);
+long __stdcall GetSwitcherMode(long SM);
+long __stdcall SetSwitcherMode(long SM);
+long __stdcall GetSwitcherSignalStates(long Signal, long *Use, long *Show);
+long __stdcall SetSwitcherSignalStates(long Signal, long Use, long Show);
+unsigned short __stdcall GetOperationState(unsigned short OS);
+long __stdcall Operation(unsigned short Op);
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _open_dll(dllpath: str) -> ctypes.WinDLL:
+    """Open the DLL once per path and return the same handle on re-open.
 
+    :param dllpath: Path to the DLL.
+
+    :return: DLL wrapped in a ctypes.WinDLL.
+    """
+    return ctypes.WinDLL(dllpath)
+
+
+@functools.lru_cache(maxsize=None)
+def _open_dll_cffi(dllpath: str):
+    """Open the DLL with cffi in ABI mode, declaring the functions we use.
+
+    :param dllpath: Path to the DLL.
+
+    :return: cffi library object with the functions declared in `_CFFI_CDEF`.
 
-def load_wlm_data_dll(dllpath: str) -> ctypes.WinDLL:
+    :raise ImportError: cffi is not installed.
+    """
+    try:
+        import cffi
+    except ImportError as err:
+        raise ImportError("The cffi backend requires the `cffi` package.") from err
+
+    ffi = cffi.FFI()
+    ffi.cdef(_CFFI_CDEF)
+    return ffi.dlopen(dllpath)
+
+
+@functools.lru_cache(maxsize=4)
+def load_wlm_data_dll(dllpath: str, backend: str = "ctypes"):
     """Load the Wavelengthmeter Data DLL.
 
+    Results are cached per path and backend, so loading the same DLL again only
+    costs a dictionary lookup. The prototypes (``argtypes`` / ``restype``) are only
+    configured the first time a given DLL handle is seen, even if the cache entry
+    was evicted in the meantime.
+
+    The optional cffi backend has a lower per-call overhead, but only declares the
+    functions used by `WavelengthMeter` and expects cffi pointers (``ffi.new``) for
+    pointer arguments. `WavelengthMeter` itself uses the ctypes backend.
+
     :param dllpath: Path to the DLL.
+    :param backend: Binding to use, either "ctypes" or "cffi".
 
-    :return: DLL wrapped in a ctypes.WinDLL with configured headers.
+    :return: DLL wrapped in a ctypes.WinDLL with configured headers, or the cffi
+        library object if the cffi backend is chosen.
+
+    :raise ValueError: Unknown backend.
     """
-    dll = ctypes.WinDLL(dllpath)
+    if backend == "cffi":
+        return _open_dll_cffi(dllpath)
+    elif backend != "ctypes":
+        raise ValueError(f"Unknown backend {backend}, use 'ctypes' or 'cffi'.")
+
+    dll = _open_dll(dllpath)
+    if id(dll) in _CONFIGURED:
+        return dll
 
     # LONG_PTR Instantiate(long RFC, long Mode, LONG_PTR P1, long P2)
     dll.Instantiate.argtypes = [
@@ -779,4 +852,5 @@ def load_wlm_data_dll(dllpath: str) -> ctypes.WinDLL:
     dll.SetScale.argtypes = [ctypes.c_ushort]
     dll.SetScale.restype = ctypes.c_long
 
+    _CONFIGURED.add(id(dll))
     return dll
@@ -4,15 +4,22 @@ This class is heavily influenced / copied from:
 https://github.com/stepansnigirev/py-ws7
 """
 
-from enum import Enum
+import contextlib
+from enum import IntEnum
 import ctypes
 from typing import List
-import warnings
+from warnings import warn as _warn
 
 from headers import load_wlm_data_dll
 from headers import wlmConst
 from utils import ProxyList
 
+__all__ = ["WavelengthMeter"]
+
+# preallocated ctypes booleans for the exposure mode calls
+_CBOOL_TRUE = ctypes.c_bool(True)
+_CBOOL_FALSE = ctypes.c_bool(False)
+
 
 class WavelengthMeter:
     """Communicate with a HighFinesse wavelenght meter.
@@ -20,6 +27,10 @@ class WavelengthMeter:
     Note: This only works on Windows. The wavelength meter software must have been
     started by the user.
 
+    The DLL calls release the GIL, so the wavelength meter can be polled from a
+    background thread without blocking the rest of the program. The individual
+    channel reads are cheap and are therefore issued sequentially.
+
     Example:
         >>> wlm = WavelengthMeter()
         >>> ch = wlm.channel[5]  # choose the sixth channel
@@ -27,6 +38,24 @@ class WavelengthMeter:
         >>> b = wlm.wavelengths  # stores all wavelengths as list in variable b
     """
 
+    __slots__ = (
+        "_dll",
+        "_batch_active",
+        "_cached_switcher_mode",
+        "_fn_wavelength",
+        "_fn_frequency",
+        "_fn_exposure_get",
+        "_fn_exposure_set",
+        "_fn_auto_get",
+        "_fn_auto_set",
+        "_fn_signal_get",
+        "_fn_signal_set",
+        "_channels",
+        "_channel_proxy",
+        "_c_indices",
+        "_zero_d",
+    )
+
     def __init__(self, dllpath: str = "C:\Windows\System32\wlmData.dll"):
         """Initialize the Wavelength meter.
 
@@ -37,7 +66,30 @@ class WavelengthMeter:
         if self._dll.GetWLMCount(0) == 0:
             raise IOError("There is no running wavelength meter server instance.")
 
-    class OperationState(Enum):
+        # cached switcher mode, only used inside a `batch` block
+        self._batch_active = False
+        self._cached_switcher_mode = False
+
+        # bind the DLL functions used by the channels once
+        self._fn_wavelength = self._dll.GetWavelengthNum
+        self._fn_frequency = self._dll.GetFrequencyNum
+        self._fn_exposure_get = self._dll.GetExposureNum
+        self._fn_exposure_set = self._dll.SetExposureNum
+        self._fn_auto_get = self._dll.GetExposureModeNum
+        self._fn_auto_set = self._dll.SetExposureModeNum
+        self._fn_signal_get = self._dll.GetSwitcherSignalStates
+        self._fn_signal_set = self._dll.SetSwitcherSignalStates
+
+        # preallocated arguments for reading all channels at once
+        self._c_indices = tuple(ctypes.c_long(idx) for idx in range(1, 9))
+        self._zero_d = ctypes.c_double(0)
+
+        self._channels = tuple(self.Channel(self, idx) for idx in range(8))
+        self._channel_proxy = ProxyList(
+            self, lambda parent, idx: parent._channels[idx], range(8)
+        )
+
+    class OperationState(IntEnum):
         """Enum class with the available operation states."""
 
         adjustment = wlmConst.cAdjustment
@@ -47,21 +99,70 @@ class WavelengthMeter:
     class Channel:
         """Wavelengthmeter channel class."""
 
+        __slots__ = (
+            "_parent",
+            "_idx",
+            "_c_idx",
+            "_zero_d",
+            "_dll",
+            "_fn_wavelength",
+            "_fn_frequency",
+            "_fn_exposure_get",
+            "_fn_exposure_set",
+            "_fn_auto_get",
+            "_fn_auto_set",
+            "_fn_signal_get",
+            "_fn_signal_set",
+            "_use_flag",
+            "_show_flag",
+            "_use_byref",
+            "_show_byref",
+        )
+
         def __init__(self, parent, idx: int):
             """Initialize the channel.
 
+            No type checking is done here, use `create_validated` when creating a
+            channel from user code.
+
+            :param parent: Parent class that is calling this one.
+            :param idx: Channel number of wavelength meter, pythonic starting at 0.
+            """
+            self._parent = parent
+            self._idx = idx + 1
+            self._c_idx = ctypes.c_long(self._idx)
+            self._zero_d = ctypes.c_double(0)
+
+            self._dll = parent._dll
+            self._fn_wavelength = parent._fn_wavelength
+            self._fn_frequency = parent._fn_frequency
+            self._fn_exposure_get = parent._fn_exposure_get
+            self._fn_exposure_set = parent._fn_exposure_set
+            self._fn_auto_get = parent._fn_auto_get
+            self._fn_auto_set = parent._fn_auto_set
+            self._fn_signal_get = parent._fn_signal_get
+            self._fn_signal_set = parent._fn_signal_set
+
+            # scratch buffers for reading the switcher signal states
+            self._use_flag = ctypes.c_long(0)
+            self._show_flag = ctypes.c_long(0)
+            self._use_byref = ctypes.byref(self._use_flag)
+            self._show_byref = ctypes.byref(self._show_flag)
+
+        @classmethod
+        def create_validated(cls, parent, idx: int):
+            """Create a channel after checking that the parent is a wavelength meter.
+
             :param parent: Parent class that is calling this one.
             :param idx: Channel number of wavelength meter, pythonic starting at 0.
 
+            :return: The new channel.
+
             :raise TypeError: Not initialized from wavelength meter channel.
             """
             if not isinstance(parent, WavelengthMeter):
                 raise TypeError("Must initialize channel from `WavelengthMeter` class.")
-
-            self._parent = parent
-            self._idx = idx + 1
-
-            self._dll = self._parent._dll
+            return cls(parent, idx)
 
         @property
         def auto_exposure(self) -> bool:
@@ -76,11 +177,11 @@ class WavelengthMeter:
                 >>> ch.auto_exposure
                 False
             """
-            return bool(self._dll.GetExposureModeNum(self._idx, True))
+            return bool(self._fn_auto_get(self._c_idx, _CBOOL_TRUE))
 
         @auto_exposure.setter
         def auto_exposure(self, value: bool):
-            self._dll.SetExposureModeNum(self._idx, value)
+            self._fn_auto_set(self._c_idx, _CBOOL_TRUE if value else _CBOOL_FALSE)
 
         @property
         def exposure(self) -> List[int]:
@@ -103,9 +204,8 @@ class WavelengthMeter:
                 >>> ch.exposure
                 [100, 100]
             """
-            exp_arr1 = int(self._dll.GetExposureNum(self._idx, 1, 0))
-            exp_arr2 = int(self._dll.GetExposureNum(self._idx, 2, 0))
-            return [exp_arr1, exp_arr2]
+            get = self._fn_exposure_get
+            return [get(self._c_idx, 1, 0), get(self._c_idx, 2, 0)]
 
         @exposure.setter
         def exposure(self, value: List[int]):
@@ -118,9 +218,9 @@ class WavelengthMeter:
                     "the CCD array exposure times."
                 )
 
-            self._dll.SetExposureNum(self._idx, 1, value[0])
+            self._fn_exposure_set(self._c_idx, 1, value[0])
             if len(value) == 2:
-                self._dll.SetExposureNum(self._idx, 2, value[1])
+                self._fn_exposure_set(self._c_idx, 2, value[1])
 
         @property
         def frequency(self) -> float:
@@ -134,7 +234,7 @@ class WavelengthMeter:
                 >>> ch.frequency
                 337.212
             """
-            return self._dll.GetFrequencyNum(self._idx, 0)
+            return self._fn_frequency(self._c_idx, self._zero_d)
 
         @property
         def show_channel(self) -> bool:
@@ -154,21 +254,15 @@ class WavelengthMeter:
                 >>> ch.show_channel
                 True
             """
-            use_flag = ctypes.c_long(0)
-            show_flag = ctypes.c_long(0)
-            self._dll.GetSwitcherSignalStates(
-                self._idx, ctypes.byref(use_flag), ctypes.byref(show_flag)
-            )
-            return bool(show_flag)
+            self._fn_signal_get(self._c_idx, self._use_byref, self._show_byref)
+            return bool(self._show_flag.value)
 
         @show_channel.setter
         def show_channel(self, value: bool):
             if self._parent.switcher_mode:
-                self._dll.SetSwitcherSignalStates(self._idx, 1, int(value))
+                self._fn_signal_set(self._c_idx, 1, int(value))
             else:
-                warnings.warn(
-                    "Switcher mode not active, therefore cannot use this" "function."
-                )
+                _warn("Switcher mode not active, therefore cannot use this" "function.")
 
         @property
         def use_channel(self) -> bool:
@@ -187,23 +281,16 @@ class WavelengthMeter:
                 >>> ch.use_channel
                 True
             """
-            use_flag = ctypes.c_long(0)
-            show_flag = ctypes.c_long(0)
-            self._dll.GetSwitcherSignalStates(
-                self._idx, ctypes.byref(use_flag), ctypes.byref(show_flag)
-            )
-            return bool(use_flag)
+            self._fn_signal_get(self._c_idx, self._use_byref, self._show_byref)
+            return bool(self._use_flag.value)
 
         @use_channel.setter
         def use_channel(self, value: bool):
             if self._parent.switcher_mode:
-                self._dll.SetSwitcherSignalStates(
-                    self._idx, int(value), int(self.show_channel)
-                )
+                self._fn_signal_get(self._c_idx, self._use_byref, self._show_byref)
+                self._fn_signal_set(self._c_idx, int(value), self._show_flag.value)
             else:
-                warnings.warn(
-                    "Switcher mode not active, therefore cannot use this" "function."
-                )
+                _warn("Switcher mode not active, therefore cannot use this" "function.")
 
         @property
         def wavelength(self) -> float:
@@ -217,7 +304,32 @@ class WavelengthMeter:
                 >>> ch.wavelength
                 837.212
             """
-            return self._dll.GetWavelengthNum(self._idx, 0)
+            return self._fn_wavelength(self._c_idx, self._zero_d)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Cache slowly varying settings for the duration of a block.
+
+        Inside the block, the switcher mode is only queried once from the wavelength
+        meter, which speeds up setting multiple channels in a row. Setting the switcher
+        mode inside the block updates the cached value.
+
+        Example:
+            >>> wlm = WavelengthMeter()
+            >>> with wlm.batch():
+            >>>     for ch in wlm.channel:
+            >>>         ch.use_channel = True
+        """
+        if self._batch_active:  # nested block, keep the outer cache
+            yield self
+            return
+
+        self._cached_switcher_mode = bool(self._dll.GetSwitcherMode(0))
+        self._batch_active = True
+        try:
+            yield self
+        finally:
+            self._batch_active = False
 
     @property
     def channel(self):
@@ -229,7 +341,7 @@ class WavelengthMeter:
             >>> wlm = WavelengthMeter()
             >>> ch = wlm.channel[2]  # third channel
         """
-        return ProxyList(self, self.Channel, range(8))
+        return self._channel_proxy
 
     @property
     def frequencies(self) -> List[float]:
@@ -240,7 +352,9 @@ class WavelengthMeter:
             >>> wlm.frequencies
             [223.232, 337.121, 339.888, 321.231, 339.981, 398.121, 420.121, 333.212]
         """
-        return [self.channel[it].frequency for it in range(8)]
+        get = self._fn_frequency
+        zero = self._zero_d
+        return [get(idx, zero) for idx in self._c_indices]
 
     @property
     def operation(self) -> OperationState:
@@ -255,10 +369,10 @@ class WavelengthMeter:
         Example:
             >>> wlm = WavelengthMeter()
             >>> wlm.operation = wlm.OperationState.measurement
-            >>> print(wlm.operation)
-            OperationState.measurement
+            >>> wlm.operation
+            <OperationState.measurement: 2>
         """
-        return self.OperationState(self._dll.GetOperationState(0))
+        return _OP_MAP[self._dll.GetOperationState(0)]
 
     @operation.setter
     def operation(self, value: OperationState):
@@ -278,11 +392,15 @@ class WavelengthMeter:
             >>> wlm.switcher_mode
             True
         """
+        if self._batch_active:
+            return self._cached_switcher_mode
         return bool(self._dll.GetSwitcherMode(0))
 
     @switcher_mode.setter
     def switcher_mode(self, value: bool):
         self._dll.SetSwitcherMode(int(value))
+        if self._batch_active:
+            self._cached_switcher_mode = bool(value)
 
     @property
     def wavelengths(self) -> List[float]:
@@ -293,4 +411,10 @@ class WavelengthMeter:
             >>> wlm.wavelengths
             [823.232, 822.121, 888.888, 888.231, 898.981, 888.121, 764.121, 921.212]
         """
-        return [self.channel[it].wavelength for it in range(8)]
+        get = self._fn_wavelength
+        zero = self._zero_d
+        return [get(idx, zero) for idx in self._c_indices]
+
+
+# DLL operation state values mapped to their `OperationState`
+_OP_MAP = {state.value: state for state in WavelengthMeter.OperationState}